@@ -1,31 +1,53 @@
 """
 Language API routes
 """
+import hashlib
 from typing import List
 
-from fastapi import APIRouter
+import orjson
+from fastapi import APIRouter, Request, Response
 
 from app.models.schemas import LanguageInfo, SUPPORTED_LANGUAGES
 
 router = APIRouter(prefix="/languages", tags=["languages"])
 
+# The language list is static, so serialize it once and let clients cache it
+_LANGUAGES_JSON = orjson.dumps([lang.model_dump() for lang in SUPPORTED_LANGUAGES])
+_LANGUAGES_ETAG = f'"{hashlib.sha256(_LANGUAGES_JSON).hexdigest()[:32]}"'
+_CACHE_HEADERS = {
+    "Cache-Control": "public, max-age=86400",
+    "ETag": _LANGUAGES_ETAG,
+}
+
+
+def _languages_response(request: Request) -> Response:
+    """Build the cached languages response, honouring If-None-Match"""
+    if_none_match = request.headers.get("if-none-match", "")
+    if if_none_match == "*" or _LANGUAGES_ETAG in if_none_match:
+        return Response(status_code=304, headers=_CACHE_HEADERS)
+    
+    return Response(
+        content=_LANGUAGES_JSON,
+        media_type="application/json",
+        headers=_CACHE_HEADERS,
+    )
+
 
 @router.get("/", response_model=List[LanguageInfo])
-async def list_languages():
+async def list_languages(request: Request):
     """Get all supported languages"""
-    return SUPPORTED_LANGUAGES
+    return _languages_response(request)
 
 
 @router.get("/source", response_model=List[LanguageInfo])
-async def list_source_languages():
+async def list_source_languages(request: Request):
     """Get languages available as source (speech recognition)"""
     # All languages can be source
-    return SUPPORTED_LANGUAGES
+    return _languages_response(request)
 
 
 @router.get("/target", response_model=List[LanguageInfo])
-async def list_target_languages():
+async def list_target_languages(request: Request):
     """Get languages available as target (translation + TTS)"""
     # All languages can be target
-    return SUPPORTED_LANGUAGES
-
+    return _languages_response(request)
@@ -3,12 +3,14 @@ Project API routes for processing server
 """
 import asyncio
 import uuid
-from typing import Dict
+from typing import Callable, Dict, Optional
 
-from fastapi import APIRouter, HTTPException, BackgroundTasks
+from arq import ArqRedis
+from cachetools import TTLCache
+from fastapi import APIRouter, HTTPException, BackgroundTasks, Depends, Request, Response
 from pydantic import BaseModel
 
-from app.services.supabase_client import get_supabase
+from app.services.supabase_client import SupabaseClient, get_supabase
 from app.services.video_processor import VideoProcessor
 
 router = APIRouter(prefix="/projects", tags=["projects"])
@@ -18,28 +20,65 @@ class VoiceMappingRequest(BaseModel):
     voice_mapping: Dict[str, str]
 
 
+def app_supabase(request: Request) -> SupabaseClient:
+    """Shared Supabase client created in the app lifespan"""
+    return request.app.state.supabase
+
+
+def app_arq(request: Request) -> Optional[ArqRedis]:
+    """Arq job queue created in the app lifespan (None without Redis)"""
+    return request.app.state.arq
+
+
+async def dispatch_job(
+    supabase: SupabaseClient,
+    arq: Optional[ArqRedis],
+    background_tasks: BackgroundTasks,
+    func: Callable,
+    project_id: str,
+    *args,
+):
+    """Send a job to the Arq worker, or run it in-process when no queue is configured"""
+    try:
+        if arq is not None:
+            await arq.enqueue_job(func.__name__, project_id, *args)
+        else:
+            background_tasks.add_task(func, project_id, *args)
+    except Exception as e:
+        # Release the claim, otherwise every retry would get a 409
+        await supabase.update_project_status(project_id, "failed", 0, f"Could not queue job: {e}")
+        raise HTTPException(503, "Could not queue job") from e
+
+
 # ============ Analysis ============
 
 @router.post("/{project_id}/analyze")
 async def analyze_speakers(
     project_id: str,
     background_tasks: BackgroundTasks,
+    supabase: SupabaseClient = Depends(app_supabase),
+    arq: Optional[ArqRedis] = Depends(app_arq),
 ):
     """Start speaker analysis (diarization)"""
-    supabase = get_supabase()
     
     project = await supabase.get_project(project_id)
     if not project:
         raise HTTPException(404, "Project not found")
     
-    if project["status"] not in ["pending", "failed"]:
-        raise HTTPException(400, "Project is already being processed")
-    
-    # Update status
-    await supabase.update_project_status(project_id, "diarizing", 5)
+    # Claim the project atomically so duplicate requests don't start a second job
+    claimed = await supabase.claim_project(
+        project_id,
+        ["pending", "failed"],
+        {"status": "diarizing", "progress": 5},
+    )
+    if not claimed:
+        raise HTTPException(409, "Project is already being processed")
     
     # Start background task
-    background_tasks.add_task(
+    await dispatch_job(
+        supabase,
+        arq,
+        background_tasks,
         run_speaker_analysis,
         project_id,
         project["original_video_url"],
@@ -86,17 +125,20 @@ async def run_speaker_analysis(
             for label, data in speakers_summary.items()
         ]
         
+        # Only move to voice_mapping once the speaker rows exist
         await supabase.create_speakers(project_id, speakers_list)
-        
-        # Update project
         await supabase.update_project(project_id, {
             "num_speakers": len(speakers_summary),
             "status": "voice_mapping",
             "progress": 25,
         })
         
-        processor.cleanup()
+        await processor.cleanup()
         
+    except asyncio.CancelledError:
+        # Job timeout/shutdown; release the claim so the project can be retried
+        await supabase.update_project_status(project_id, "failed", 0, "Job cancelled")
+        raise
     except Exception as e:
         await supabase.update_project_status(project_id, "failed", 0, str(e))
 
@@ -108,9 +150,10 @@ async def start_processing(
     project_id: str,
     request: VoiceMappingRequest,
     background_tasks: BackgroundTasks,
+    supabase: SupabaseClient = Depends(app_supabase),
+    arq: Optional[ArqRedis] = Depends(app_arq),
 ):
     """Start full dubbing process"""
-    supabase = get_supabase()
     
     project = await supabase.get_project(project_id)
     if not project:
@@ -119,15 +162,24 @@ async def start_processing(
     if not request.voice_mapping:
         raise HTTPException(400, "Voice mapping required")
     
-    # Update voice mapping
-    await supabase.update_project(project_id, {
-        "voice_mapping": request.voice_mapping,
-        "status": "transcribing",
-        "progress": 30,
-    })
+    # Update voice mapping, claiming the project so a retry can't run it twice
+    claimed = await supabase.claim_project(
+        project_id,
+        ["voice_mapping", "failed", "completed"],
+        {
+            "voice_mapping": request.voice_mapping,
+            "status": "transcribing",
+            "progress": 30,
+        },
+    )
+    if not claimed:
+        raise HTTPException(409, "Project is already being processed")
     
     # Start background processing
-    background_tasks.add_task(
+    await dispatch_job(
+        supabase,
+        arq,
+        background_tasks,
         run_full_processing,
         project_id,
         request.voice_mapping
@@ -140,9 +192,8 @@ async def run_full_processing(project_id: str, voice_mapping: Dict[str, str]):
     """Background task for full video processing"""
     supabase = get_supabase()
     
-    project = await supabase.get_project(project_id)
-    
     try:
+        project = await supabase.get_project(project_id)
         processor = VideoProcessor(project_id)
         
         await processor.process_full_pipeline(
@@ -153,21 +204,50 @@ async def run_full_processing(project_id: str, voice_mapping: Dict[str, str]):
             num_speakers=project["num_speakers"] or -1,
         )
         
+    except asyncio.CancelledError:
+        # Job timeout/shutdown; release the claim so the project can be retried
+        await supabase.update_project_status(project_id, "failed", 0, "Job cancelled")
+        raise
     except Exception as e:
         await supabase.update_project_status(project_id, "failed", 0, str(e))
 
 
 # ============ Status ============
 
+# Short-lived project cache for the frequently polled status endpoint
+_status_cache: TTLCache = TTLCache(maxsize=10_000, ttl=1.0)
+# Reads in flight per project, so concurrent cache misses share one query
+_status_reads: Dict[str, asyncio.Task] = {}
+
+
+async def _read_status(supabase: SupabaseClient, project_id: str) -> Optional[Dict]:
+    project = await supabase.get_project(project_id)
+    if project:
+        _status_cache[project_id] = project
+    return project
+
+
 @router.get("/{project_id}/status")
-async def get_processing_status(project_id: str):
+async def get_processing_status(
+    project_id: str,
+    response: Response,
+    supabase: SupabaseClient = Depends(app_supabase),
+):
     """Get current processing status"""
-    supabase = get_supabase()
-    
-    project = await supabase.get_project(project_id)
-    if not project:
-        raise HTTPException(404, "Project not found")
+    # Concurrent pollers of the same project share one DB read per second
+    project = _status_cache.get(project_id)
+    if project is None:
+        read = _status_reads.get(project_id)
+        if read is None:
+            read = asyncio.create_task(_read_status(supabase, project_id))
+            _status_reads[project_id] = read
+            read.add_done_callback(lambda _: _status_reads.pop(project_id, None))
+        # Shielded so one poller disconnecting doesn't cancel the others' read
+        project = await asyncio.shield(read)
+        if not project:
+            raise HTTPException(404, "Project not found")
     
+    response.headers["Cache-Control"] = "public, max-age=1"
     return {
         "project_id": project_id,
         "status": project["status"],
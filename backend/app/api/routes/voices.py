@@ -6,7 +6,7 @@ from typing import List
 from fastapi import APIRouter, HTTPException
 
 from app.models.schemas import ElevenLabsVoice, VoiceListResponse
-from app.services.elevenlabs_service import ElevenLabsService
+from app.services.elevenlabs_service import get_elevenlabs
 
 router = APIRouter(prefix="/voices", tags=["voices"])
 
@@ -14,7 +14,7 @@ router = APIRouter(prefix="/voices", tags=["voices"])
 @router.get("/", response_model=VoiceListResponse)
 async def list_voices():
     """Get all available ElevenLabs voices"""
-    service = ElevenLabsService()
+    service = get_elevenlabs()
     voices_data = await service.get_voices()
     
     voices = [
@@ -34,7 +34,7 @@ async def list_voices():
 @router.get("/{voice_id}", response_model=ElevenLabsVoice)
 async def get_voice(voice_id: str):
     """Get voice details by ID"""
-    service = ElevenLabsService()
+    service = get_elevenlabs()
     voice = await service.get_voice_by_id(voice_id)
     
     if not voice:
@@ -59,7 +59,7 @@ async def list_voice_categories():
 async def preview_voice(voice_id: str, text: str = "Hello, this is a voice preview."):
     """Generate a preview audio for a voice"""
     # For now, return the ElevenLabs preview URL if available
-    service = ElevenLabsService()
+    service = get_elevenlabs()
     voice = await service.get_voice_by_id(voice_id)
     
     if not voice:
@@ -18,6 +18,12 @@ class Settings(BaseSettings):
     # Server
     HOST: str = "0.0.0.0"
     PORT: int = int(os.getenv("PORT", "8000"))  # Railway sets PORT env
+    WEB_CONCURRENCY: int = int(os.getenv("WEB_CONCURRENCY", "2"))
+    
+    # CORS (comma-separated origins). Optional regex for this project's preview
+    # deploys only, e.g. https://dichvideo(-[a-z0-9-]+)?\.vercel\.app
+    CORS_ORIGINS: str = os.getenv("CORS_ORIGINS", "http://localhost:3000")
+    CORS_ORIGIN_REGEX: Optional[str] = os.getenv("CORS_ORIGIN_REGEX") or None
     
     # Paths
     BASE_DIR: Path = Path(__file__).parent.parent
@@ -28,14 +34,40 @@ class Settings(BaseSettings):
     SUPABASE_URL: str = os.getenv("SUPABASE_URL", "")
     SUPABASE_SERVICE_KEY: str = os.getenv("SUPABASE_SERVICE_KEY", "")
     SUPABASE_STORAGE_BUCKET: str = "videos"
+    # Direct Postgres via the Supavisor transaction pooler (port 6543), e.g.
+    # postgresql://postgres.<ref>:<password>@<region>.pooler.supabase.com:6543/postgres
+    SUPABASE_DB_URL: Optional[str] = os.getenv("SUPABASE_DB_URL")
+    SUPABASE_DB_POOL_MIN: int = 1  # Per process; grows on demand up to the max
+    SUPABASE_DB_POOL_MAX: int = 15  # Stay under Supabase's per-project connection cap
+    
+    # PyVideoTrans API
+    PYVIDEOTRANS_API_URL: str = os.getenv("PYVIDEOTRANS_API_URL", "http://localhost:9011")
     
     # ElevenLabs
     ELEVENLABS_API_KEY: Optional[str] = os.getenv("ELEVENLABS_API_KEY")
+    ELEVENLABS_MODEL_ID: str = os.getenv("ELEVENLABS_MODEL_ID", "eleven_multilingual_v2")
+    ELEVENLABS_MAX_CONCURRENCY: int = int(os.getenv("ELEVENLABS_MAX_CONCURRENCY", "2"))  # Free plan limit
+    ELEVENLABS_RPM: int = int(os.getenv("ELEVENLABS_RPM", "0"))  # 0 = no per-minute limit
+    TTS_CONCURRENCY: int = int(os.getenv("TTS_CONCURRENCY", "8"))  # Per-pipeline fan-out
+    TTS_CACHE_MAX_MB: int = int(os.getenv("TTS_CACHE_MAX_MB", "2048"))  # Oldest entries evicted past this
+    
+    # Task queue: "background" runs jobs in the API process (BackgroundTasks);
+    # "arq" enqueues them on Redis for app.worker, which must then be running
+    JOB_QUEUE: str = os.getenv("JOB_QUEUE", "background")
+    REDIS_URL: Optional[str] = os.getenv("REDIS_URL")
+    WORKER_MAX_JOBS: int = int(os.getenv("WORKER_MAX_JOBS", "2"))
+    WORKER_JOB_TIMEOUT: int = 3 * 3600  # seconds
     
     # Processing
     MAX_VIDEO_DURATION: int = 3600  # 1 hour
     WHISPER_MODEL: str = os.getenv("WHISPER_MODEL", "medium")
+    # Defaults to int8_float16 on CUDA and int8 on CPU. WHISPER_MODEL may point at a
+    # pre-converted directory (ct2-transformers-converter --quantization int8_float16)
+    WHISPER_COMPUTE_TYPE: Optional[str] = os.getenv("WHISPER_COMPUTE_TYPE")
     USE_CUDA: bool = os.getenv("USE_CUDA", "false").lower() == "true"
+    # Fused VAD + batched ASR + diarization via WhisperX (optional dependency)
+    USE_WHISPERX: bool = os.getenv("USE_WHISPERX", "false").lower() == "true"
+    HF_TOKEN: Optional[str] = os.getenv("HF_TOKEN")  # pyannote models for WhisperX diarization
     
     class Config:
         env_file = ".env"
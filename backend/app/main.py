@@ -4,12 +4,19 @@ Deployed on Railway/Render
 """
 import logging
 from contextlib import asynccontextmanager
+from typing import Optional
 
+from arq import ArqRedis, create_pool
+from arq.connections import RedisSettings
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 
 from app.config import settings
-from app.api.routes import projects, voices
+from app.api.routes import languages, projects, voices
+from app.services.elevenlabs_service import get_elevenlabs
+from app.services.pyvideotrans_client import get_pyvideotrans
+from app.services.supabase_client import get_supabase
 
 # Configure logging
 logging.basicConfig(
@@ -19,13 +26,38 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
+async def connect_job_queue() -> Optional[ArqRedis]:
+    """Arq pool when JOB_QUEUE=arq; None runs jobs in-process instead"""
+    if settings.JOB_QUEUE != "arq":
+        return None
+    if not settings.REDIS_URL:
+        logger.warning("JOB_QUEUE=arq but REDIS_URL is not set; running jobs in-process")
+        return None
+    try:
+        return await create_pool(RedisSettings.from_dsn(settings.REDIS_URL))
+    except Exception as e:
+        logger.warning(f"Redis unavailable ({e}); running jobs in-process")
+        return None
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Application lifespan events"""
     logger.info(f"Starting {settings.APP_NAME}...")
     logger.info(f"Supabase URL: {settings.SUPABASE_URL[:30]}...")
+    pyvideotrans = get_pyvideotrans()
+    # One process-wide Supabase client, connected before the first request
+    app.state.supabase = get_supabase()
+    await app.state.supabase.connect()
+    # Job queue for heavy processing, consumed by app.worker
+    app.state.arq = await connect_job_queue()
     yield
     logger.info("Shutting down...")
+    await pyvideotrans.aclose()
+    await get_elevenlabs().aclose()
+    await app.state.supabase.close()
+    if app.state.arq is not None:
+        await app.state.arq.close()
 
 
 # Create FastAPI app
@@ -45,24 +77,24 @@ app = FastAPI(
     """,
     version=settings.APP_VERSION,
     lifespan=lifespan,
+    default_response_class=ORJSONResponse,
 )
 
 # CORS middleware
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=[
-        "http://localhost:3000",
-        "https://*.vercel.app",
-        "*",  # Be more restrictive in production
-    ],
+    allow_origins=[o.strip() for o in settings.CORS_ORIGINS.split(",") if o.strip()],
+    allow_origin_regex=settings.CORS_ORIGIN_REGEX,
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    max_age=86400,  # Let browsers cache preflight responses for 24h
 )
 
 # Include routers
 app.include_router(projects.router, prefix="/api")
 app.include_router(voices.router, prefix="/api")
+app.include_router(languages.router, prefix="/api")
 
 
 @app.get("/")
@@ -92,5 +124,9 @@ if __name__ == "__main__":
         "app.main:app",
         host=settings.HOST,
         port=settings.PORT,
+        loop="uvloop",
+        http="httptools",
+        # Reload mode only supports a single worker
+        workers=1 if settings.DEBUG else settings.WEB_CONCURRENCY,
         reload=settings.DEBUG,
     )
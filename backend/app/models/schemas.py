@@ -0,0 +1,45 @@
+"""
+API response schemas
+"""
+from typing import Dict, List, Optional
+
+from pydantic import BaseModel
+
+
+class LanguageInfo(BaseModel):
+    code: str
+    name: str
+    native_name: str
+
+
+class ElevenLabsVoice(BaseModel):
+    voice_id: str
+    name: str
+    category: str = "premade"
+    labels: Dict[str, str] = {}
+    preview_url: Optional[str] = None
+
+
+class VoiceListResponse(BaseModel):
+    voices: List[ElevenLabsVoice]
+
+
+SUPPORTED_LANGUAGES: List[LanguageInfo] = [
+    LanguageInfo(code="vi", name="Vietnamese", native_name="Tiếng Việt"),
+    LanguageInfo(code="en", name="English", native_name="English"),
+    LanguageInfo(code="zh-cn", name="Chinese (Simplified)", native_name="简体中文"),
+    LanguageInfo(code="zh-tw", name="Chinese (Traditional)", native_name="繁體中文"),
+    LanguageInfo(code="ja", name="Japanese", native_name="日本語"),
+    LanguageInfo(code="ko", name="Korean", native_name="한국어"),
+    LanguageInfo(code="fr", name="French", native_name="Français"),
+    LanguageInfo(code="de", name="German", native_name="Deutsch"),
+    LanguageInfo(code="es", name="Spanish", native_name="Español"),
+    LanguageInfo(code="pt", name="Portuguese", native_name="Português"),
+    LanguageInfo(code="ru", name="Russian", native_name="Русский"),
+    LanguageInfo(code="th", name="Thai", native_name="ไทย"),
+    LanguageInfo(code="id", name="Indonesian", native_name="Bahasa Indonesia"),
+    LanguageInfo(code="it", name="Italian", native_name="Italiano"),
+    LanguageInfo(code="ar", name="Arabic", native_name="العربية"),
+    LanguageInfo(code="hi", name="Hindi", native_name="हिन्दी"),
+    LanguageInfo(code="tr", name="Turkish", native_name="Türkçe"),
+]
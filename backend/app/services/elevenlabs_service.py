@@ -1,128 +1,272 @@
 """
 ElevenLabs API Service for multi-voice TTS
 """
-import json
+import asyncio
 import logging
+import time
+from collections import deque
 from pathlib import Path
-from typing import List, Dict, Optional
+from typing import AsyncIterator, Deque, List, Dict, Optional, Tuple
+import aiofiles
 import httpx
-from elevenlabs import ElevenLabs, VoiceSettings
+import orjson
+from elevenlabs import VoiceSettings
+from elevenlabs.client import AsyncElevenLabs
 
 from app.config import settings
 
 logger = logging.getLogger(__name__)
 
+# Voice list cache: (fetched_at, voices, voices_by_id)
+VOICES_CACHE_TTL = 300  # seconds
+_voices_cache: Optional[Tuple[float, List[Dict], Dict[str, Dict]]] = None
+_voices_lock = asyncio.Lock()
+
+# Fallback hardcoded voices
+_FALLBACK_VOICES: List[Dict] = [
+    {"voice_id": "21m00Tcm4TlvDq8ikWAM", "name": "Rachel", "category": "premade", "labels": {"gender": "female"}, "preview_url": None},
+    {"voice_id": "AZnzlk1XvdvUeBnXmlld", "name": "Domi", "category": "premade", "labels": {"gender": "female"}, "preview_url": None},
+    {"voice_id": "EXAVITQu4vr4xnSDxMaL", "name": "Bella", "category": "premade", "labels": {"gender": "female"}, "preview_url": None},
+    {"voice_id": "ErXwobaYiN019PkySvjV", "name": "Antoni", "category": "premade", "labels": {"gender": "male"}, "preview_url": None},
+    {"voice_id": "MF3mGyEYCl7XYWbV9V6O", "name": "Elli", "category": "premade", "labels": {"gender": "female"}, "preview_url": None},
+    {"voice_id": "TxGEqnHWrfWFTfGW9XjX", "name": "Josh", "category": "premade", "labels": {"gender": "male"}, "preview_url": None},
+    {"voice_id": "VR6AewLTigWG4xSOukaG", "name": "Arnold", "category": "premade", "labels": {"gender": "male"}, "preview_url": None},
+    {"voice_id": "pNInz6obpgDQGcFmaJgB", "name": "Adam", "category": "premade", "labels": {"gender": "male"}, "preview_url": None},
+    {"voice_id": "yoZ06aMxZJJ28mfd3POQ", "name": "Sam", "category": "premade", "labels": {"gender": "male"}, "preview_url": None},
+]
+
+
+def _load_default_voices() -> List[Dict]:
+    """Load default voices from pyvideotrans elevenlabs.json"""
+    voice_file = settings.PYVIDEOTRANS_DIR / "videotrans" / "voicejson" / "elevenlabs.json"
+    
+    if voice_file.exists():
+        try:
+            voices_data = orjson.loads(voice_file.read_bytes())
+            
+            return [
+                {
+                    "voice_id": data.get("voice_id", ""),
+                    "name": name,
+                    "category": "premade",
+                    "labels": {},
+                    "preview_url": None,
+                }
+                for name, data in voices_data.items()
+                if isinstance(data, dict) and data.get("voice_id")
+            ]
+        except Exception as e:
+            logger.error(f"Error reading voices file: {e}")
+    
+    return _FALLBACK_VOICES
+
+
+# Parsed once at import; used whenever ElevenLabs is unavailable
+_DEFAULT_VOICES = _load_default_voices()
+_DEFAULT_VOICES_BY_ID = {voice["voice_id"]: voice for voice in _DEFAULT_VOICES}
+
+
+# Retries for HTTP 429 (too many concurrent requests / rate limited)
+TTS_MAX_RETRIES = 3
+
+# Raw 16-bit mono PCM output, mixed by ffmpeg without an MP3 decode
+PCM_SAMPLE_RATE = 22050
+PCM_OUTPUT_FORMAT = f"pcm_{PCM_SAMPLE_RATE}"
+
+
+class RateLimiter:
+    """Sliding-window limiter allowing at most `rpm` requests per minute"""
+    
+    def __init__(self, rpm: int):
+        self.rpm = rpm
+        self._calls: Deque[float] = deque()
+        self._lock = asyncio.Lock()
+    
+    async def acquire(self):
+        """Wait until another request fits in the current window"""
+        if self.rpm <= 0:
+            return
+        
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                while self._calls and now - self._calls[0] >= 60:
+                    self._calls.popleft()
+                if len(self._calls) < self.rpm:
+                    break
+                await asyncio.sleep(60 - (now - self._calls[0]))
+            self._calls.append(time.monotonic())
+
 
 class ElevenLabsService:
     """Service for ElevenLabs API interactions"""
     
+    # Shared by every instance so all TTS calls in the process queue together
+    _semaphore = asyncio.Semaphore(settings.ELEVENLABS_MAX_CONCURRENCY)
+    _rate_limiter = RateLimiter(settings.ELEVENLABS_RPM)
+    
     def __init__(self, api_key: Optional[str] = None):
         self.api_key = api_key or settings.ELEVENLABS_API_KEY
         self.client = None
+        self.http: Optional[httpx.AsyncClient] = None
         if self.api_key:
-            self.client = ElevenLabs(api_key=self.api_key)
+            # Pooled connections shared by every SDK call on this service
+            self.http = httpx.AsyncClient(
+                limits=httpx.Limits(max_connections=20, max_keepalive_connections=10),
+                timeout=httpx.Timeout(120.0, connect=10.0),
+            )
+            self.client = AsyncElevenLabs(api_key=self.api_key, httpx_client=self.http)
     
-    async def get_voices(self) -> List[Dict]:
-        """Get all available voices from ElevenLabs"""
-        if not self.client:
-            # Return default voices from pyvideotrans config
-            return self._get_default_voices()
-        
-        try:
-            voices = self.client.voices.get_all()
-            return [
-                {
-                    "voice_id": voice.voice_id,
-                    "name": voice.name,
-                    "category": voice.category or "premade",
-                    "labels": voice.labels or {},
-                    "preview_url": voice.preview_url,
-                }
-                for voice in voices.voices
-            ]
-        except Exception as e:
-            logger.error(f"Error fetching voices: {e}")
-            return self._get_default_voices()
+    async def aclose(self):
+        """Close the underlying HTTP connection pool"""
+        if self.http is not None:
+            await self.http.aclose()
     
-    def _get_default_voices(self) -> List[Dict]:
-        """Get default voices from pyvideotrans elevenlabs.json"""
-        voice_file = settings.PYVIDEOTRANS_DIR / "videotrans" / "voicejson" / "elevenlabs.json"
+    async def get_voices(self) -> List[Dict]:
+        """Get all available voices (cached for VOICES_CACHE_TTL seconds)"""
+        global _voices_cache
         
-        if voice_file.exists():
-            try:
-                with open(voice_file, 'r', encoding='utf-8') as f:
-                    voices_data = json.load(f)
-                
-                return [
-                    {
-                        "voice_id": data.get("voice_id", ""),
-                        "name": name,
-                        "category": "premade",
-                        "labels": {},
-                        "preview_url": None,
-                    }
-                    for name, data in voices_data.items()
-                    if isinstance(data, dict) and data.get("voice_id")
-                ]
-            except Exception as e:
-                logger.error(f"Error reading voices file: {e}")
+        cached = _voices_cache
+        if cached and time.monotonic() - cached[0] < VOICES_CACHE_TTL:
+            return cached[1]
         
-        # Fallback hardcoded voices
+        # Only one coroutine refreshes; the others wait and reuse its result
+        async with _voices_lock:
+            cached = _voices_cache
+            if cached and time.monotonic() - cached[0] < VOICES_CACHE_TTL:
+                return cached[1]
+            
+            if not self.client:
+                # Return default voices from pyvideotrans config
+                voices = self._get_default_voices()
+            else:
+                try:
+                    voices = await self._fetch_voices()
+                except Exception as e:
+                    logger.error(f"Error fetching voices: {e}")
+                    # Don't cache the fallback so the next request retries
+                    return self._get_default_voices()
+            
+            _voices_cache = (
+                time.monotonic(),
+                voices,
+                {voice["voice_id"]: voice for voice in voices},
+            )
+            return voices
+    
+    async def _fetch_voices(self) -> List[Dict]:
+        """Fetch all available voices from ElevenLabs"""
+        voices = await self.client.voices.get_all()
         return [
-            {"voice_id": "21m00Tcm4TlvDq8ikWAM", "name": "Rachel", "category": "premade", "labels": {"gender": "female"}, "preview_url": None},
-            {"voice_id": "AZnzlk1XvdvUeBnXmlld", "name": "Domi", "category": "premade", "labels": {"gender": "female"}, "preview_url": None},
-            {"voice_id": "EXAVITQu4vr4xnSDxMaL", "name": "Bella", "category": "premade", "labels": {"gender": "female"}, "preview_url": None},
-            {"voice_id": "ErXwobaYiN019PkySvjV", "name": "Antoni", "category": "premade", "labels": {"gender": "male"}, "preview_url": None},
-            {"voice_id": "MF3mGyEYCl7XYWbV9V6O", "name": "Elli", "category": "premade", "labels": {"gender": "female"}, "preview_url": None},
-            {"voice_id": "TxGEqnHWrfWFTfGW9XjX", "name": "Josh", "category": "premade", "labels": {"gender": "male"}, "preview_url": None},
-            {"voice_id": "VR6AewLTigWG4xSOukaG", "name": "Arnold", "category": "premade", "labels": {"gender": "male"}, "preview_url": None},
-            {"voice_id": "pNInz6obpgDQGcFmaJgB", "name": "Adam", "category": "premade", "labels": {"gender": "male"}, "preview_url": None},
-            {"voice_id": "yoZ06aMxZJJ28mfd3POQ", "name": "Sam", "category": "premade", "labels": {"gender": "male"}, "preview_url": None},
+            {
+                "voice_id": voice.voice_id,
+                "name": voice.name,
+                "category": voice.category or "premade",
+                "labels": voice.labels or {},
+                "preview_url": voice.preview_url,
+            }
+            for voice in voices.voices
         ]
     
+    def _get_default_voices(self) -> List[Dict]:
+        """Get default voices from pyvideotrans elevenlabs.json"""
+        return _DEFAULT_VOICES
+    
     async def generate_speech(
         self,
         text: str,
         voice_id: str,
         output_path: Path,
         speed: float = 1.0,
+        output_format: str = "mp3_44100_128",
     ) -> bool:
         """Generate speech audio file"""
         if not self.client:
             logger.error("ElevenLabs client not initialized")
             return False
         
-        try:
-            response = self.client.text_to_speech.convert(
-                text=text,
-                voice_id=voice_id,
-                model_id="eleven_multilingual_v2",
-                output_format="mp3_44100_128",
-                voice_settings=VoiceSettings(
-                    speed=speed,
-                    stability=0.5,
-                    similarity_boost=0.75,
-                    style=0.0,
-                    use_speaker_boost=True
-                )
+        for attempt in range(TTS_MAX_RETRIES + 1):
+            try:
+                # Queue behind the plan's concurrency and RPM limits
+                async with self._semaphore:
+                    await self._rate_limiter.acquire()
+                    await self._convert_to_file(
+                        text, voice_id, output_path, speed, output_format
+                    )
+                return True
+            except Exception as e:
+                if getattr(e, "status_code", None) == 429 and attempt < TTS_MAX_RETRIES:
+                    delay = 2 ** attempt
+                    logger.warning(f"ElevenLabs rate limited, retrying in {delay}s")
+                    await asyncio.sleep(delay)
+                    continue
+                logger.error(f"Error generating speech: {e}")
+                return False
+        return False
+    
+    def stream_audio(
+        self,
+        text: str,
+        voice_id: str,
+        speed: float = 1.0,
+        output_format: str = PCM_OUTPUT_FORMAT,
+    ) -> AsyncIterator[bytes]:
+        """Stream synthesized audio chunks (raw PCM by default)"""
+        return self.client.text_to_speech.convert(
+            text=text,
+            voice_id=voice_id,
+            model_id=settings.ELEVENLABS_MODEL_ID,
+            output_format=output_format,
+            voice_settings=VoiceSettings(
+                speed=speed,
+                stability=0.5,
+                similarity_boost=0.75,
+                style=0.0,
+                use_speaker_boost=True
             )
-            
-            # Save to file
-            with open(output_path, 'wb') as f:
-                for chunk in response:
-                    if chunk:
-                        f.write(chunk)
-            
-            return True
-        except Exception as e:
-            logger.error(f"Error generating speech: {e}")
-            return False
+        )
+    
+    async def _convert_to_file(
+        self,
+        text: str,
+        voice_id: str,
+        output_path: Path,
+        speed: float,
+        output_format: str,
+    ):
+        """Run the TTS request and stream the audio chunks to disk"""
+        response = self.stream_audio(text, voice_id, speed, output_format)
+        
+        # Save to file as the audio streams in
+        async with aiofiles.open(output_path, 'wb') as f:
+            async for chunk in response:
+                if chunk:
+                    await f.write(chunk)
     
     async def get_voice_by_id(self, voice_id: str) -> Optional[Dict]:
         """Get voice details by ID"""
         voices = await self.get_voices()
+        
+        cached = _voices_cache
+        if cached and cached[1] is voices:
+            return cached[2].get(voice_id)
+        if voices is _DEFAULT_VOICES:
+            return _DEFAULT_VOICES_BY_ID.get(voice_id)
+        
         for voice in voices:
             if voice["voice_id"] == voice_id:
                 return voice
         return None
 
+
+# Singleton instance
+_elevenlabs_service: Optional[ElevenLabsService] = None
+
+
+def get_elevenlabs() -> ElevenLabsService:
+    """Get ElevenLabs service singleton"""
+    global _elevenlabs_service
+    if _elevenlabs_service is None:
+        _elevenlabs_service = ElevenLabsService()
+    return _elevenlabs_service
+
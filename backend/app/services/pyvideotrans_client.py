@@ -4,6 +4,7 @@ Communicates with pyvideotrans Flask API
 """
 import asyncio
 import logging
+import random
 from pathlib import Path
 from typing import Dict, Optional, List, Any
 import httpx
@@ -19,13 +20,26 @@ class PyVideoTransClient:
     def __init__(self, base_url: Optional[str] = None):
         self.base_url = base_url or settings.PYVIDEOTRANS_API_URL
         self.timeout = httpx.Timeout(30.0, connect=10.0)
+        # Long-lived pooled client so polling reuses keep-alive connections
+        self._client = httpx.AsyncClient(
+            base_url=self.base_url,
+            timeout=self.timeout,
+            limits=httpx.Limits(
+                max_connections=50,
+                max_keepalive_connections=20,
+                keepalive_expiry=30,
+            ),
+        )
+    
+    async def aclose(self):
+        """Close the underlying HTTP connection pool"""
+        await self._client.aclose()
     
     async def health_check(self) -> bool:
         """Check if pyvideotrans API is running"""
         try:
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                response = await client.get(f"{self.base_url}/")
-                return response.status_code == 200
+            response = await self._client.get("/")
+            return response.status_code == 200
         except Exception as e:
             logger.error(f"PyVideoTrans health check failed: {e}")
             return False
@@ -43,25 +57,24 @@ class PyVideoTransClient:
         Returns task_id
         """
         try:
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                response = await client.post(
-                    f"{self.base_url}/recogn",
-                    json={
-                        "name": video_path,
-                        "recogn_type": recogn_type,
-                        "model_name": model_name,
-                        "detect_language": detect_language,
-                        "is_cuda": is_cuda,
-                        "split_type": "all",
-                    }
-                )
-                data = response.json()
-                
-                if data.get("code") == 0:
-                    return data.get("task_id")
-                else:
-                    logger.error(f"Recognition error: {data.get('msg')}")
-                    return None
+            response = await self._client.post(
+                "/recogn",
+                json={
+                    "name": video_path,
+                    "recogn_type": recogn_type,
+                    "model_name": model_name,
+                    "detect_language": detect_language,
+                    "is_cuda": is_cuda,
+                    "split_type": "all",
+                }
+            )
+            data = response.json()
+            
+            if data.get("code") == 0:
+                return data.get("task_id")
+            else:
+                logger.error(f"Recognition error: {data.get('msg')}")
+                return None
         except Exception as e:
             logger.error(f"Recognition request failed: {e}")
             return None
@@ -78,23 +91,22 @@ class PyVideoTransClient:
         Returns task_id
         """
         try:
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                response = await client.post(
-                    f"{self.base_url}/translate_srt",
-                    json={
-                        "name": srt_content,
-                        "source_code": source_language,
-                        "target_language": target_language,
-                        "translate_type": translate_type,
-                    }
-                )
-                data = response.json()
-                
-                if data.get("code") == 0:
-                    return data.get("task_id")
-                else:
-                    logger.error(f"Translation error: {data.get('msg')}")
-                    return None
+            response = await self._client.post(
+                "/translate_srt",
+                json={
+                    "name": srt_content,
+                    "source_code": source_language,
+                    "target_language": target_language,
+                    "translate_type": translate_type,
+                }
+            )
+            data = response.json()
+            
+            if data.get("code") == 0:
+                return data.get("task_id")
+            else:
+                logger.error(f"Translation error: {data.get('msg')}")
+                return None
         except Exception as e:
             logger.error(f"Translation request failed: {e}")
             return None
@@ -113,26 +125,25 @@ class PyVideoTransClient:
         Returns task_id
         """
         try:
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                response = await client.post(
-                    f"{self.base_url}/tts",
-                    json={
-                        "name": srt_content,
-                        "voice_role": voice_role,
-                        "target_language_code": target_language,
-                        "tts_type": tts_type,
-                        "voice_rate": voice_rate,
-                        "voice_autorate": voice_autorate,
-                        "out_ext": "wav",
-                    }
-                )
-                data = response.json()
-                
-                if data.get("code") == 0:
-                    return data.get("task_id")
-                else:
-                    logger.error(f"TTS error: {data.get('msg')}")
-                    return None
+            response = await self._client.post(
+                "/tts",
+                json={
+                    "name": srt_content,
+                    "voice_role": voice_role,
+                    "target_language_code": target_language,
+                    "tts_type": tts_type,
+                    "voice_rate": voice_rate,
+                    "voice_autorate": voice_autorate,
+                    "out_ext": "wav",
+                }
+            )
+            data = response.json()
+            
+            if data.get("code") == 0:
+                return data.get("task_id")
+            else:
+                logger.error(f"TTS error: {data.get('msg')}")
+                return None
         except Exception as e:
             logger.error(f"TTS request failed: {e}")
             return None
@@ -156,32 +167,31 @@ class PyVideoTransClient:
         Returns task_id
         """
         try:
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                response = await client.post(
-                    f"{self.base_url}/trans_video",
-                    json={
-                        "name": video_path,
-                        "recogn_type": recogn_type,
-                        "model_name": model_name,
-                        "is_cuda": is_cuda,
-                        "translate_type": translate_type,
-                        "source_language": source_language,
-                        "target_language": target_language,
-                        "tts_type": tts_type,
-                        "voice_role": voice_role,
-                        "voice_rate": "+0%",
-                        "voice_autorate": voice_autorate,
-                        "subtitle_type": subtitle_type,
-                        "is_separate": False,
-                    }
-                )
-                data = response.json()
-                
-                if data.get("code") == 0:
-                    return data.get("task_id")
-                else:
-                    logger.error(f"Translation error: {data.get('msg')}")
-                    return None
+            response = await self._client.post(
+                "/trans_video",
+                json={
+                    "name": video_path,
+                    "recogn_type": recogn_type,
+                    "model_name": model_name,
+                    "is_cuda": is_cuda,
+                    "translate_type": translate_type,
+                    "source_language": source_language,
+                    "target_language": target_language,
+                    "tts_type": tts_type,
+                    "voice_role": voice_role,
+                    "voice_rate": "+0%",
+                    "voice_autorate": voice_autorate,
+                    "subtitle_type": subtitle_type,
+                    "is_separate": False,
+                }
+            )
+            data = response.json()
+            
+            if data.get("code") == 0:
+                return data.get("task_id")
+            else:
+                logger.error(f"Translation error: {data.get('msg')}")
+                return None
         except Exception as e:
             logger.error(f"Full translation request failed: {e}")
             return None
@@ -193,12 +203,11 @@ class PyVideoTransClient:
         code: -1=in progress, 0=success, >0=error
         """
         try:
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                response = await client.post(
-                    f"{self.base_url}/task_status",
-                    json={"task_id": task_id}
-                )
-                return response.json()
+            response = await self._client.post(
+                "/task_status",
+                json={"task_id": task_id}
+            )
+            return response.json()
         except Exception as e:
             logger.error(f"Task status request failed: {e}")
             return {"code": 1, "msg": str(e)}
@@ -206,16 +215,21 @@ class PyVideoTransClient:
     async def wait_for_task(
         self,
         task_id: str,
-        poll_interval: float = 2.0,
+        poll_interval: float = 0.5,
         timeout: float = 3600.0,  # 1 hour
         progress_callback: Optional[callable] = None,
+        max_poll_interval: float = 30.0,
     ) -> Dict[str, Any]:
         """
         Wait for task to complete
+        Polls with exponential backoff (plus jitter), honouring a
+        server-provided retry_after hint when present
         """
-        elapsed = 0.0
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        interval = poll_interval
         
-        while elapsed < timeout:
+        while loop.time() < deadline:
             status = await self.get_task_status(task_id)
             
             if progress_callback:
@@ -229,8 +243,39 @@ class PyVideoTransClient:
                 return status
             
             # In progress, wait and retry
-            await asyncio.sleep(poll_interval)
-            elapsed += poll_interval
+            retry_after = self._retry_after_hint(status)
+            if retry_after is not None:
+                delay = min(retry_after, max_poll_interval)
+            else:
+                delay = interval + random.uniform(0, interval * 0.1)
+                interval = min(interval * 1.5, max_poll_interval)
+            
+            await asyncio.sleep(min(delay, max(deadline - loop.time(), 0)))
         
         return {"code": 2, "msg": "Task timeout"}
+    
+    @staticmethod
+    def _retry_after_hint(status: Dict[str, Any]) -> Optional[float]:
+        """Extract a retry_after hint (seconds) from a task status response"""
+        for source in (status, status.get("data") or {}):
+            if not isinstance(source, dict):
+                continue
+            value = source.get("retry_after")
+            if value is not None:
+                try:
+                    return max(float(value), 0.0)
+                except (TypeError, ValueError):
+                    return None
+        return None
+
+
+# Singleton instance
+_pyvideotrans_client: Optional[PyVideoTransClient] = None
+
 
+def get_pyvideotrans() -> PyVideoTransClient:
+    """Get PyVideoTrans client singleton"""
+    global _pyvideotrans_client
+    if _pyvideotrans_client is None:
+        _pyvideotrans_client = PyVideoTransClient()
+    return _pyvideotrans_client
@@ -1,36 +1,161 @@
 """
 Supabase client for backend processing server
 """
+import asyncio
 import os
 from typing import Optional, Dict, Any, List
-from supabase import create_client, Client
+from supabase import acreate_client, AClient
+import aiofiles
 import httpx
 
 from app.config import settings
 
+# Connection pool shared by PostgREST queries and storage transfers
+HTTP_LIMITS = httpx.Limits(max_connections=20, max_keepalive_connections=10)
+HTTP_TIMEOUT = httpx.Timeout(30.0, connect=5.0)
+
+# Rows per INSERT round-trip for bulk speaker/segment writes
+INSERT_BATCH_SIZE = 500
+
+# Chunk size for streamed storage transfers
+DOWNLOAD_CHUNK_SIZE = 1 << 20  # 1 MB
+
 
 class SupabaseClient:
     """Supabase client for database and storage operations"""
     
     def __init__(self):
-        self.client: Client = create_client(
-            settings.SUPABASE_URL,
-            settings.SUPABASE_SERVICE_KEY
-        )
+        self.client: Optional[AClient] = None
         self.bucket = settings.SUPABASE_STORAGE_BUCKET
+        self.http = httpx.AsyncClient(limits=HTTP_LIMITS, timeout=HTTP_TIMEOUT)
+        self._connect_lock = asyncio.Lock()
+        self._db_pool = None
+        self._db_pool_lock = asyncio.Lock()
+    
+    async def _get_client(self) -> AClient:
+        """Create the async Supabase client on first use"""
+        if self.client is None:
+            async with self._connect_lock:
+                if self.client is None:
+                    client = await acreate_client(
+                        settings.SUPABASE_URL,
+                        settings.SUPABASE_SERVICE_KEY
+                    )
+                    # Swap PostgREST's default session for a pooled one
+                    session = client.postgrest.session
+                    client.postgrest.session = httpx.AsyncClient(
+                        base_url=session.base_url,
+                        headers=session.headers,
+                        limits=HTTP_LIMITS,
+                        timeout=HTTP_TIMEOUT,
+                    )
+                    await session.aclose()
+                    self.client = client
+        return self.client
+    
+    async def _get_db_pool(self):
+        """
+        Get the asyncpg pool for direct Postgres access
+        Returns None when SUPABASE_DB_URL is not configured
+        """
+        if not settings.SUPABASE_DB_URL:
+            return None
+        
+        if self._db_pool is None:
+            async with self._db_pool_lock:
+                if self._db_pool is None:
+                    import asyncpg
+                    
+                    # The transaction pooler can't keep named prepared
+                    # statements across transactions, so disable the cache
+                    self._db_pool = await asyncpg.create_pool(
+                        settings.SUPABASE_DB_URL,
+                        min_size=settings.SUPABASE_DB_POOL_MIN,
+                        max_size=settings.SUPABASE_DB_POOL_MAX,
+                        statement_cache_size=0,
+                    )
+        return self._db_pool
+    
+    async def _insert_rows(self, table: str, rows: List[Dict]) -> List[Dict]:
+        """Insert rows through the Postgres pool, one multi-row INSERT per batch"""
+        pool = await self._get_db_pool()
+        columns = list(rows[0].keys())
+        column_list = ", ".join(f'"{col}"' for col in columns)
+        # Postgres caps a statement at 32767 bind parameters
+        batch_size = max(1, min(INSERT_BATCH_SIZE, 32767 // len(columns)))
+        
+        inserted = []
+        async with pool.acquire() as conn:
+            async with conn.transaction():
+                for start in range(0, len(rows), batch_size):
+                    batch = rows[start:start + batch_size]
+                    values = ", ".join(
+                        "(" + ", ".join(
+                            f"${r * len(columns) + c + 1}" for c in range(len(columns))
+                        ) + ")"
+                        for r in range(len(batch))
+                    )
+                    args = [row.get(col) for row in batch for col in columns]
+                    query = f'INSERT INTO "{table}" ({column_list}) VALUES {values} RETURNING *'
+                    inserted.extend(await conn.fetch(query, *args))
+        return [dict(record) for record in inserted]
+    
+    async def _insert_rest(self, table: str, rows: List[Dict]) -> List[Dict]:
+        """Insert rows through PostgREST, sending batches concurrently"""
+        client = await self._get_client()
+        responses = await asyncio.gather(*[
+            client.table(table).insert(rows[start:start + INSERT_BATCH_SIZE]).execute()
+            for start in range(0, len(rows), INSERT_BATCH_SIZE)
+        ])
+        return [record for response in responses for record in response.data]
+    
+    async def connect(self):
+        """Open the Supabase client and database pool up front"""
+        await self._get_client()
+        await self._get_db_pool()
+    
+    async def close(self):
+        """Close pooled HTTP and database connections"""
+        if self.client is not None:
+            await self.client.postgrest.session.aclose()
+        await self.http.aclose()
+        if self._db_pool is not None:
+            await self._db_pool.close()
     
     # ============ Projects ============
     
     async def get_project(self, project_id: str) -> Optional[Dict]:
         """Get project by ID"""
-        response = self.client.table("projects").select("*").eq("id", project_id).single().execute()
+        client = await self._get_client()
+        response = await client.table("projects").select("*").eq("id", project_id).single().execute()
         return response.data
     
     async def update_project(self, project_id: str, data: Dict[str, Any]) -> Dict:
         """Update project"""
-        response = self.client.table("projects").update(data).eq("id", project_id).execute()
+        client = await self._get_client()
+        response = await client.table("projects").update(data).eq("id", project_id).execute()
         return response.data[0] if response.data else {}
     
+    async def claim_project(
+        self,
+        project_id: str,
+        allowed_statuses: List[str],
+        data: Dict[str, Any],
+    ) -> bool:
+        """
+        Atomically update a project only if its status is one of allowed_statuses
+        Returns False when another request already moved it on
+        """
+        client = await self._get_client()
+        response = await (
+            client.table("projects")
+            .update(data)
+            .eq("id", project_id)
+            .in_("status", allowed_statuses)
+            .execute()
+        )
+        return bool(response.data)
+    
     async def update_project_status(
         self,
         project_id: str,
@@ -64,63 +189,81 @@ class SupabaseClient:
             for spk in speakers
         ]
         
-        response = self.client.table("speakers").insert(speaker_records).execute()
-        return response.data
+        if not speaker_records:
+            return []
+        
+        if settings.SUPABASE_DB_URL:
+            return await self._insert_rows("speakers", speaker_records)
+        
+        return await self._insert_rest("speakers", speaker_records)
     
     async def get_speakers(self, project_id: str) -> List[Dict]:
         """Get speakers for a project"""
-        response = self.client.table("speakers").select("*").eq("project_id", project_id).execute()
+        client = await self._get_client()
+        response = await client.table("speakers").select("*").eq("project_id", project_id).execute()
         return response.data
     
     # ============ Segments ============
     
     async def create_segments(self, project_id: str, segments: List[Dict]) -> List[Dict]:
         """Create segment records"""
-        response = self.client.table("segments").insert(segments).execute()
-        return response.data
+        if not segments:
+            return []
+        
+        if settings.SUPABASE_DB_URL:
+            return await self._insert_rows("segments", segments)
+        
+        return await self._insert_rest("segments", segments)
     
     # ============ Storage ============
     
     async def download_video(self, video_url: str, local_path: str) -> str:
         """Download video from Supabase Storage"""
-        # Extract path from URL
         # URL format: https://xxx.supabase.co/storage/v1/object/public/videos/path
-        path = video_url.split(f"{self.bucket}/")[-1]
-        
-        # Download using httpx
-        async with httpx.AsyncClient() as client:
-            response = await client.get(video_url)
+        # Stream to disk in 1 MB chunks instead of buffering the whole video
+        async with self.http.stream("GET", video_url, follow_redirects=True) as response:
             response.raise_for_status()
             
-            with open(local_path, "wb") as f:
-                f.write(response.content)
+            async with aiofiles.open(local_path, "wb") as f:
+                async for chunk in response.aiter_bytes(DOWNLOAD_CHUNK_SIZE):
+                    await f.write(chunk)
         
         return local_path
     
-    async def upload_video(self, local_path: str, storage_path: str) -> str:
-        """Upload video to Supabase Storage"""
-        with open(local_path, "rb") as f:
-            self.client.storage.from_(self.bucket).upload(
-                storage_path,
-                f,
-                file_options={"content-type": "video/mp4"}
-            )
+    async def _upload_file(self, local_path: str, storage_path: str, content_type: str) -> str:
+        """Stream a local file to Supabase Storage and return its public URL"""
+        storage_url = f"{settings.SUPABASE_URL}/storage/v1/object"
+        
+        async def file_chunks():
+            async with aiofiles.open(local_path, "rb") as f:
+                while chunk := await f.read(DOWNLOAD_CHUNK_SIZE):
+                    yield chunk
+        
+        # Explicit Content-Length keeps the body streamed rather than chunked
+        response = await self.http.post(
+            f"{storage_url}/{self.bucket}/{storage_path}",
+            content=file_chunks(),
+            headers={
+                "Authorization": f"Bearer {settings.SUPABASE_SERVICE_KEY}",
+                "apikey": settings.SUPABASE_SERVICE_KEY,
+                "Content-Type": content_type,
+                "Content-Length": str(os.path.getsize(local_path)),
+                # Reprocessing a project overwrites its previous output
+                "x-upsert": "true",
+            },
+        )
+        response.raise_for_status()
         
         # Get public URL
-        url = self.client.storage.from_(self.bucket).get_public_url(storage_path)
-        return url
+        return f"{storage_url}/public/{self.bucket}/{storage_path}"
+    
+    async def upload_video(self, local_path: str, storage_path: str) -> str:
+        """Upload video to Supabase Storage"""
+        return await self._upload_file(local_path, storage_path, "video/mp4")
     
     async def upload_audio(self, local_path: str, storage_path: str) -> str:
         """Upload audio file to Supabase Storage"""
-        with open(local_path, "rb") as f:
-            self.client.storage.from_(self.bucket).upload(
-                storage_path,
-                f,
-                file_options={"content-type": "audio/wav"}
-            )
-        
-        url = self.client.storage.from_(self.bucket).get_public_url(storage_path)
-        return url
+        return await self._upload_file(local_path, storage_path, "audio/wav")
 
 
 # Singleton instance
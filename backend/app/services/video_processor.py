@@ -4,19 +4,173 @@ Handles the complete multi-speaker dubbing workflow
 Works with Supabase for storage and database
 """
 import asyncio
+import hashlib
 import logging
 import os
 import shutil
 import sys
 import uuid
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, List, Optional, Callable
+from typing import Awaitable, Dict, List, Optional, Callable, Tuple
+
+import numpy as np
+import soundfile as sf
 
 from app.config import settings
+from app.services.elevenlabs_service import PCM_OUTPUT_FORMAT, PCM_SAMPLE_RATE, get_elevenlabs
 from app.services.supabase_client import get_supabase
 
+# pyvideotrans is a source checkout, not an installed package. Its modules and
+# faster-whisper are imported where used so the web process never loads them.
+if str(settings.PYVIDEOTRANS_DIR) not in sys.path:
+    sys.path.insert(0, str(settings.PYVIDEOTRANS_DIR))
+
 logger = logging.getLogger(__name__)
 
+# Batched Whisper inference
+WHISPER_BATCH_SIZE = 16
+WHISPER_CLIP_SECONDS = 30
+
+# Synthesized segments shared across projects and retries, keyed by content hash
+TTS_CACHE_DIR = settings.TEMP_DIR / "_tts_cache"
+
+# Max ffmpeg inputs (open files) per amix; longer videos are pre-mixed in groups
+MIX_GROUP_SIZE = 256
+
+# Batched translation
+TRANSLATE_BATCH_SIZE = 50
+TRANSLATE_CONCURRENCY = 4
+
+
+async def run_ffmpeg(args: List[str]):
+    """Run ffmpeg quietly, raising with its stderr if it fails"""
+    process = await asyncio.create_subprocess_exec(
+        "ffmpeg", "-y", "-hide_banner", "-loglevel", "error", "-nostats", *args,
+        stdout=asyncio.subprocess.DEVNULL,
+        stderr=asyncio.subprocess.PIPE
+    )
+    _, stderr = await process.communicate()
+    
+    if process.returncode != 0:
+        raise RuntimeError(f"ffmpeg failed: {stderr.decode(errors='replace').strip()}")
+
+
+# Video encoders for renders where stream copy fails, best first. Hardware
+# encoders are used only if this ffmpeg build lists them.
+HW_VIDEO_ENCODERS = {
+    "h264_nvenc": ["-preset", "p1", "-tune", "ll", "-bf", "0", "-rc", "vbr", "-cq", "23"],
+    "h264_qsv": ["-preset", "veryfast", "-global_quality", "23"],
+}
+SW_VIDEO_ENCODER = ["-c:v", "libx264", "-preset", "veryfast", "-crf", "23"]
+
+_video_encoders: Optional[List[List[str]]] = None
+
+# ffmpeg errors meaning the source video stream can't be copied into mp4 as-is
+VIDEO_COPY_ERRORS = (
+    "could not find tag for codec",
+    "not currently supported in container",
+    "incompatible with output codec",
+    "incorrect codec parameters",
+    "could not write header",
+)
+# ffmpeg errors meaning an encoder (or its device) isn't usable here
+VIDEO_ENCODER_ERRORS = (
+    "error while opening encoder",
+    "error initializing output stream",
+    "no nvenc capable devices",
+    "cannot load",
+    "device creation failed",
+    "no device available",
+)
+
+
+def ffmpeg_error_matches(error: Exception, patterns) -> bool:
+    """Whether an ffmpeg failure's stderr mentions any of the given messages"""
+    message = str(error).lower()
+    return any(pattern in message for pattern in patterns)
+
+
+async def video_encoders() -> List[List[str]]:
+    """Video codec arguments to try for a real encode, probed once per process"""
+    global _video_encoders
+    if _video_encoders is None:
+        process = await asyncio.create_subprocess_exec(
+            "ffmpeg", "-hide_banner", "-encoders",
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.DEVNULL
+        )
+        stdout, _ = await process.communicate()
+        available = {
+            fields[1]
+            for fields in map(str.split, stdout.decode(errors="replace").splitlines())
+            if len(fields) > 1
+        }
+        _video_encoders = [
+            ["-c:v", name, *flags]
+            for name, flags in HW_VIDEO_ENCODERS.items()
+            if name in available
+        ] + [SW_VIDEO_ENCODER]
+    return _video_encoders
+
+
+def _whisper_compute_type() -> str:
+    """CTranslate2 compute type shared by faster-whisper and WhisperX"""
+    return settings.WHISPER_COMPUTE_TYPE or (
+        "int8_float16" if settings.USE_CUDA else "int8"
+    )
+
+
+@lru_cache(maxsize=1)
+def _whisper():
+    """Whisper model, loaded once per process"""
+    from faster_whisper import WhisperModel
+    
+    return WhisperModel(
+        settings.WHISPER_MODEL,
+        device="cuda" if settings.USE_CUDA else "cpu",
+        compute_type=_whisper_compute_type(),
+        num_workers=2,
+    )
+
+
+@lru_cache(maxsize=1)
+def _batched_whisper():
+    """Batched inference pipeline around the shared Whisper model"""
+    from faster_whisper import BatchedInferencePipeline
+    
+    return BatchedInferencePipeline(model=_whisper())
+
+
+@lru_cache(maxsize=1)
+def _whisperx_model():
+    """WhisperX ASR pipeline (VAD + batched faster-whisper), loaded once per process"""
+    import whisperx
+    
+    return whisperx.load_model(
+        settings.WHISPER_MODEL,
+        "cuda" if settings.USE_CUDA else "cpu",
+        compute_type=_whisper_compute_type(),
+    )
+
+
+@lru_cache(maxsize=1)
+def _whisperx_diarizer():
+    """WhisperX (pyannote) diarization pipeline, loaded once per process"""
+    import whisperx
+    
+    return whisperx.DiarizationPipeline(
+        use_auth_token=settings.HF_TOKEN,
+        device="cuda" if settings.USE_CUDA else "cpu",
+    )
+
+
+def _whisperx_diarize(audio: np.ndarray, num_speakers: int):
+    """Diarize decoded audio, honouring a fixed speaker count when given"""
+    if num_speakers > 0:
+        return _whisperx_diarizer()(audio, num_speakers=num_speakers)
+    return _whisperx_diarizer()(audio)
+
 
 class VideoProcessor:
     """
@@ -29,9 +183,8 @@ class VideoProcessor:
     4. Speech-to-text (transcribe each segment)
     5. Translation
     6. Multi-voice TTS (different voice per speaker)
-    7. Audio sync & mixing
-    8. Final video render
-    9. Upload result to Supabase Storage
+    7. Audio sync & mixing + final video render (single ffmpeg pass)
+    8. Upload result to Supabase Storage
     """
     
     def __init__(self, project_id: str):
@@ -39,11 +192,7 @@ class VideoProcessor:
         self.work_dir = settings.TEMP_DIR / project_id
         self.work_dir.mkdir(parents=True, exist_ok=True)
         self.supabase = get_supabase()
-        
-        # Add pyvideotrans to path
-        pyvideotrans_path = str(settings.PYVIDEOTRANS_DIR)
-        if pyvideotrans_path not in sys.path:
-            sys.path.insert(0, pyvideotrans_path)
+        self.audio_duration_sec: Optional[float] = None
     
     async def download_source_video(self, video_url: str) -> Path:
         """Download video from Supabase Storage"""
@@ -56,7 +205,6 @@ class VideoProcessor:
         audio_path = self.work_dir / "original_audio.wav"
         
         cmd = [
-            "ffmpeg", "-y",
             "-i", str(video_path),
             "-vn",
             "-acodec", "pcm_s16le",
@@ -65,16 +213,14 @@ class VideoProcessor:
             str(audio_path)
         ]
         
-        process = await asyncio.create_subprocess_exec(
-            *cmd,
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE
-        )
-        await process.wait()
+        await run_ffmpeg(cmd)
         
         if not audio_path.exists():
             raise Exception("Failed to extract audio from video")
         
+        info = sf.info(str(audio_path))
+        self.audio_duration_sec = info.frames / info.samplerate
+        
         return audio_path
     
     async def run_speaker_diarization(
@@ -84,10 +230,19 @@ class VideoProcessor:
         num_speakers: int = -1,
     ) -> List[Dict]:
         """Run speaker diarization using pyvideotrans"""
+        if settings.USE_WHISPERX:
+            # Same diarizer as the fused pipeline, so speaker labels line up
+            # between analysis and processing
+            return await asyncio.to_thread(
+                self._whisperx_speaker_turns, audio_path, num_speakers
+            )
+        
         try:
             from videotrans.diarization import get_diariz
             
-            results = get_diariz(
+            # Diarization is blocking and CPU-heavy; keep it off the event loop
+            results = await asyncio.to_thread(
+                get_diariz,
                 wave_filename=str(audio_path),
                 language=language[:2],
                 num_speakers=num_speakers,
@@ -109,24 +264,98 @@ class VideoProcessor:
             logger.error(f"Speaker diarization failed: {e}")
             raise
     
+    def _whisperx_speaker_turns(self, audio_path: Path, num_speakers: int) -> List[Dict]:
+        """Speaker turns from the WhisperX diarization pipeline (blocking)"""
+        import whisperx
+        
+        diarization = _whisperx_diarize(whisperx.load_audio(str(audio_path)), num_speakers)
+        return [
+            {
+                "speaker": speaker,
+                "start_ms": int(start * 1000),
+                "end_ms": int(end * 1000),
+            }
+            for start, end, speaker in zip(
+                diarization["start"], diarization["end"], diarization["speaker"]
+            )
+        ]
+    
+    async def transcribe_with_speakers(
+        self,
+        audio_path: Path,
+        language: str = "en",
+        num_speakers: int = -1,
+    ) -> List[Dict]:
+        """
+        Fused WhisperX pass: VAD, batched ASR over 30s chunks, diarization
+        and speaker assignment on a single decode of the audio
+        
+        Returns the same segment shape as diarization + transcription.
+        """
+        try:
+            return await asyncio.to_thread(
+                self._whisperx_transcribe, audio_path, language, num_speakers
+            )
+        except Exception as e:
+            logger.error(f"WhisperX transcription failed: {e}")
+            raise
+    
+    def _whisperx_transcribe(
+        self, audio_path: Path, language: str, num_speakers: int
+    ) -> List[Dict]:
+        """Blocking body of transcribe_with_speakers"""
+        import whisperx
+        
+        audio = whisperx.load_audio(str(audio_path))
+        result = _whisperx_model().transcribe(
+            audio, batch_size=WHISPER_BATCH_SIZE, language=language[:2]
+        )
+        result = whisperx.assign_word_speakers(
+            _whisperx_diarize(audio, num_speakers), result
+        )
+        
+        segments = []
+        for seg in result["segments"]:
+            text = seg["text"].strip()
+            if not text:
+                continue
+            segments.append({
+                "speaker": seg.get("speaker", "SPEAKER_00"),
+                "start_ms": int(seg["start"] * 1000),
+                "end_ms": int(seg["end"] * 1000),
+                "text": text,
+            })
+        return segments
+    
     def get_speakers_summary(self, segments: List[Dict]) -> Dict[str, Dict]:
         """Summarize speaker statistics from segments"""
-        speakers = {}
+        if not segments:
+            return {}
         
-        for seg in segments:
-            spk = seg["speaker"]
-            if spk not in speakers:
-                speakers[spk] = {
-                    "label": spk,
-                    "total_duration_ms": 0,
-                    "segment_count": 0,
-                    "segments": []
-                }
-            
-            duration = seg["end_ms"] - seg["start_ms"]
-            speakers[spk]["total_duration_ms"] += duration
-            speakers[spk]["segment_count"] += 1
-            speakers[spk]["segments"].append(seg)
+        labels = np.array([seg["speaker"] for seg in segments])
+        durations = np.fromiter(
+            (seg["end_ms"] - seg["start_ms"] for seg in segments),
+            dtype=np.int64,
+            count=len(segments),
+        )
+        
+        # Group by speaker in one vectorized pass
+        unique_labels, inverse, counts = np.unique(
+            labels, return_inverse=True, return_counts=True
+        )
+        totals = np.bincount(inverse, weights=durations).astype(np.int64)
+        
+        # Segment indices per speaker (in timeline order) rather than copies
+        groups = np.split(np.argsort(inverse, kind="stable"), np.cumsum(counts)[:-1])
+        
+        speakers = {}
+        for k, spk in enumerate(unique_labels.tolist()):
+            speakers[spk] = {
+                "label": spk,
+                "total_duration_ms": int(totals[k]),
+                "segment_count": int(counts[k]),
+                "segment_indices": groups[k].tolist(),
+            }
         
         return speakers
     
@@ -136,37 +365,43 @@ class VideoProcessor:
         segments: List[Dict],
         language: str = "en",
     ) -> List[Dict]:
-        """Transcribe each segment using Whisper"""
+        """Transcribe all segments in batches using Whisper"""
         try:
-            from faster_whisper import WhisperModel
-            import soundfile as sf
+            # First call loads the weights; later projects reuse the cached model
+            batched = await asyncio.to_thread(_batched_whisper)
+            
+            sample_rate = sf.info(str(audio_path)).samplerate
+            
+            # Whisper decodes 30s windows, so longer segments become several clips
+            max_clip = WHISPER_CLIP_SECONDS * sample_rate
+            starts_ms = np.fromiter(
+                (seg["start_ms"] for seg in segments), dtype=np.int64, count=len(segments)
+            )
+            ends_ms = np.fromiter(
+                (seg["end_ms"] for seg in segments), dtype=np.int64, count=len(segments)
+            )
+            start_samples = (starts_ms * sample_rate // 1000).tolist()
+            end_samples = (ends_ms * sample_rate // 1000).tolist()
+            
+            clips = []  # (segment index, start sample, end sample)
+            for i, (start_sample, end_sample) in enumerate(zip(start_samples, end_samples)):
+                for clip_start in range(start_sample, end_sample, max_clip):
+                    clips.append((i, clip_start, min(clip_start + max_clip, end_sample)))
+            clips.sort(key=lambda clip: clip[1])
             
-            model = WhisperModel(
-                settings.WHISPER_MODEL,
-                device="cuda" if settings.USE_CUDA else "cpu",
-                compute_type="float16" if settings.USE_CUDA else "int8"
+            # Only the speech clips are read, never the whole WAV
+            audio_data, clips = await asyncio.to_thread(self._read_clips, audio_path, clips)
+            
+            texts = await asyncio.to_thread(
+                self._transcribe_clips,
+                batched, audio_data, sample_rate, clips, len(segments), language
             )
             
-            audio_data, sample_rate = sf.read(str(audio_path))
             transcribed = []
             
-            for seg in segments:
-                start_sample = int(seg["start_ms"] * sample_rate / 1000)
-                end_sample = int(seg["end_ms"] * sample_rate / 1000)
-                segment_audio = audio_data[start_sample:end_sample]
-                
-                result_segments, info = model.transcribe(
-                    segment_audio,
-                    language=language[:2],
-                    task="transcribe"
-                )
-                
-                text = " ".join([s.text for s in result_segments]).strip()
-                
-                transcribed.append({
-                    **seg,
-                    "text": text
-                })
+            for seg, text in zip(segments, texts):
+                seg["text"] = text
+                transcribed.append(seg)
             
             return transcribed
             
@@ -174,6 +409,60 @@ class VideoProcessor:
             logger.error(f"Transcription failed: {e}")
             raise
     
+    @staticmethod
+    def _read_clips(audio_path: Path, clips: List[tuple]):
+        """
+        Read the given clips from the WAV into one packed float32 buffer
+        Returns the buffer and the clips re-addressed into it
+        """
+        chunks = []
+        packed_clips = []
+        offset = 0
+        
+        with sf.SoundFile(str(audio_path)) as snd:
+            for seg_index, start, end in clips:
+                snd.seek(start)
+                # float32 mono is what CTranslate2 consumes, so no cast later
+                chunk = snd.read(end - start, dtype="float32", always_2d=False)
+                chunks.append(chunk)
+                packed_clips.append((seg_index, offset, offset + len(chunk)))
+                offset += len(chunk)
+        
+        audio_data = np.concatenate(chunks) if chunks else np.zeros(0, dtype=np.float32)
+        return audio_data, packed_clips
+    
+    @staticmethod
+    def _transcribe_clips(
+        batched,
+        audio_data,
+        sample_rate: int,
+        clips: List[tuple],
+        num_segments: int,
+        language: str,
+    ) -> List[str]:
+        """Run batched Whisper over all clips (blocking; run in a worker thread)"""
+        pieces: List[List[str]] = [[] for _ in range(num_segments)]
+        if not clips:
+            return [""] * num_segments
+        
+        result_segments, info = batched.transcribe(
+            audio_data,
+            language=language[:2],
+            task="transcribe",
+            batch_size=WHISPER_BATCH_SIZE,
+            vad_filter=False,
+            clip_timestamps=[{"start": start, "end": end} for _, start, end in clips],
+        )
+        
+        # Map each decoded piece back to its clip (and segment) by timestamp
+        clip_starts = np.array([start for _, start, _ in clips])
+        for result in result_segments:
+            midpoint = (result.start + result.end) / 2 * sample_rate
+            clip = max(int(np.searchsorted(clip_starts, midpoint, side="right")) - 1, 0)
+            pieces[clips[clip][0]].append(result.text.strip())
+        
+        return [" ".join(texts).strip() for texts in pieces]
+    
     async def translate_segments(
         self,
         segments: List[Dict],
@@ -184,23 +473,47 @@ class VideoProcessor:
         try:
             from videotrans.translator._google import trans
             
+            def translate_one(text: str) -> str:
+                result = trans(
+                    text=text,
+                    source_code=source_language,
+                    target_code=target_language
+                )
+                return result if result else text
+            
+            def translate_batch(texts: List[str]) -> List[str]:
+                # One request per batch: lines in, lines out
+                result = trans(
+                    text="\n".join(texts),
+                    source_code=source_language,
+                    target_code=target_language
+                )
+                lines = result.split("\n") if isinstance(result, str) else []
+                if len(lines) != len(texts):
+                    # Line structure didn't survive; translate individually
+                    return [translate_one(text) for text in texts]
+                return [line.strip() or text for line, text in zip(lines, texts)]
+            
+            # Batch the non-empty texts (newlines would break the line mapping)
+            indices = [i for i, seg in enumerate(segments) if seg.get("text")]
+            texts = [" ".join(segments[i]["text"].splitlines()) for i in indices]
+            semaphore = asyncio.Semaphore(TRANSLATE_CONCURRENCY)
+            
+            async def run_batch(batch: List[str]) -> List[str]:
+                async with semaphore:
+                    return await asyncio.to_thread(translate_batch, batch)
+            
+            batches = await asyncio.gather(*[
+                run_batch(texts[start:start + TRANSLATE_BATCH_SIZE])
+                for start in range(0, len(texts), TRANSLATE_BATCH_SIZE)
+            ])
+            results = dict(zip(indices, (text for batch in batches for text in batch)))
+            
             translated = []
             
-            for seg in segments:
-                if seg.get("text"):
-                    result = trans(
-                        text=seg["text"],
-                        source_code=source_language,
-                        target_code=target_language
-                    )
-                    translated_text = result if result else seg["text"]
-                else:
-                    translated_text = ""
-                
-                translated.append({
-                    **seg,
-                    "translated_text": translated_text
-                })
+            for i, seg in enumerate(segments):
+                seg["translated_text"] = results.get(i, "")
+                translated.append(seg)
             
             return translated
             
@@ -215,142 +528,255 @@ class VideoProcessor:
         target_language: str,
     ) -> List[Dict]:
         """Generate TTS audio for each segment using assigned voices"""
-        from app.services.elevenlabs_service import ElevenLabsService
-        
-        elevenlabs = ElevenLabsService()
+        elevenlabs = get_elevenlabs()
         audio_dir = self.work_dir / "segment_audio"
         audio_dir.mkdir(exist_ok=True)
+        TTS_CACHE_DIR.mkdir(parents=True, exist_ok=True)
         
-        generated = []
+        semaphore = asyncio.Semaphore(settings.TTS_CONCURRENCY)
+        speed = 1.0
         
-        for i, seg in enumerate(segments):
+        async def generate_one(i: int, seg: Dict) -> Dict:
             text = seg.get("translated_text") or seg.get("text", "")
             speaker = seg["speaker"]
             voice_id = voice_mapping.get(speaker)
             
             if text and voice_id:
-                audio_path = audio_dir / f"seg_{i:04d}_{speaker}.mp3"
+                audio_path = audio_dir / f"seg_{i:04d}_{speaker}.pcm"
                 
-                success = await elevenlabs.generate_speech(
-                    text=text,
-                    voice_id=voice_id,
-                    output_path=audio_path,
-                    speed=1.0
-                )
+                # Identical text + voice settings reuse earlier synthesis
+                key = hashlib.blake2b(
+                    f"{voice_id}|{speed}|{settings.ELEVENLABS_MODEL_ID}|{PCM_OUTPUT_FORMAT}|{text}".encode(),
+                    digest_size=16,
+                ).hexdigest()
+                cached = TTS_CACHE_DIR / f"{key}.pcm"
                 
-                if success:
-                    generated.append({
-                        **seg,
-                        "audio_path": str(audio_path)
-                    })
+                if self._cache_hit(cached) and self._link_file(cached, audio_path):
+                    success = True
                 else:
-                    generated.append(seg)
-            else:
-                generated.append(seg)
+                    async with semaphore:
+                        success = await elevenlabs.generate_speech(
+                            text=text,
+                            voice_id=voice_id,
+                            output_path=audio_path,
+                            speed=speed,
+                            output_format=PCM_OUTPUT_FORMAT,
+                        )
+                    # Never cache an empty or truncated response
+                    success = success and self._is_complete_pcm(audio_path)
+                    if success:
+                        self._link_file(audio_path, cached)
+                
+                if success:
+                    seg["audio_path"] = str(audio_path)
+            return seg
+        
+        # Requests overlap; gather keeps results in segment order
+        generated = await asyncio.gather(
+            *[generate_one(i, seg) for i, seg in enumerate(segments)]
+        )
         
-        return generated
+        await asyncio.to_thread(self._prune_tts_cache)
+        
+        return list(generated)
     
-    async def mix_audio(
-        self,
-        video_path: Path,
-        segments: List[Dict],
-    ) -> Path:
-        """Mix dubbed audio segments"""
-        output_audio = self.work_dir / "mixed_audio.wav"
-        
-        # Get video duration
-        duration_cmd = [
-            "ffprobe", "-v", "error",
-            "-show_entries", "format=duration",
-            "-of", "default=noprint_wrappers=1:nokey=1",
-            str(video_path)
-        ]
+    @staticmethod
+    def _is_complete_pcm(path: Path) -> bool:
+        """Non-empty and a whole number of 16-bit samples"""
+        try:
+            size = path.stat().st_size
+        except OSError:
+            return False
+        return size > 0 and size % 2 == 0
+    
+    def _cache_hit(self, cached: Path) -> bool:
+        """Check a TTS cache entry, dropping bad ones and refreshing good ones"""
+        if not self._is_complete_pcm(cached):
+            cached.unlink(missing_ok=True)
+            return False
+        try:
+            # mtime doubles as last-used time for eviction
+            os.utime(cached)
+        except OSError:
+            return False
+        return True
+    
+    @staticmethod
+    def _prune_tts_cache():
+        """Evict least recently used TTS cache entries beyond TTS_CACHE_MAX_MB"""
+        entries = []
+        total = 0
+        with os.scandir(TTS_CACHE_DIR) as it:
+            for entry in it:
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+                total += stat.st_size
         
-        process = await asyncio.create_subprocess_exec(
-            *duration_cmd,
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE
+        limit = settings.TTS_CACHE_MAX_MB * 1024 * 1024
+        for _, size, path in sorted(entries):
+            if total <= limit:
+                break
+            try:
+                os.unlink(path)
+            except OSError:
+                continue
+            total -= size
+    
+    @staticmethod
+    def _link_file(source: Path, target: Path) -> bool:
+        """Hard-link source to target, copying across filesystems"""
+        try:
+            os.link(source, target)
+        except FileExistsError:
+            pass
+        except OSError:
+            try:
+                shutil.copyfile(source, target)
+            except OSError as e:
+                logger.warning(f"Could not link {source} to {target}: {e}")
+                return False
+        return True
+    
+    @staticmethod
+    def _track_inputs(tracks: List[Tuple[str, int]]) -> List[str]:
+        """ffmpeg input args for (audio path, start ms) tracks"""
+        input_args = []
+        for audio_path, _ in tracks:
+            if audio_path.endswith(".pcm"):
+                # Headerless TTS output: 16-bit mono at the ElevenLabs PCM rate
+                input_args += ["-f", "s16le", "-ar", str(PCM_SAMPLE_RATE), "-ac", "1"]
+            input_args += ["-i", audio_path]
+        return input_args
+    
+    @staticmethod
+    def _delay_mix_graph(
+        tracks: List[Tuple[str, int]],
+        first_input: int,
+        base_input: Optional[int],
+        duration: str,
+    ) -> str:
+        """adelay each track to its start and amix them (over an optional base) into [aout]"""
+        graph = "".join(
+            f"[{first_input + i}:a]adelay={start_ms}|{start_ms}[a{i}];"
+            for i, (_, start_ms) in enumerate(tracks)
         )
-        stdout, _ = await process.communicate()
-        total_duration = float(stdout.decode().strip())
+        if base_input is not None:
+            graph += f"[{base_input}:a]"
+        graph += "".join(f"[a{i}]" for i in range(len(tracks)))
+        # normalize=0 keeps each segment at full volume instead of 1/N
+        inputs = len(tracks) + (base_input is not None)
+        graph += f"amix=inputs={inputs}:duration={duration}:normalize=0[aout]"
+        return graph
+    
+    async def _submix(self, index: int, tracks: List[Tuple[str, int]]) -> Tuple[str, int]:
+        """Pre-mix a group of tracks into one WAV that starts at the group's first segment"""
+        offset = min(start_ms for _, start_ms in tracks)
+        relative = [(audio_path, start_ms - offset) for audio_path, start_ms in tracks]
         
-        # Create silent base
-        silence_cmd = [
-            "ffmpeg", "-y",
-            "-f", "lavfi",
-            "-i", f"anullsrc=channel_layout=stereo:sample_rate=44100",
-            "-t", str(total_duration),
-            str(output_audio)
-        ]
+        graph_path = self.work_dir / f"submix_{index:03d}.filtergraph"
+        graph_path.write_text(self._delay_mix_graph(relative, 0, None, "longest"))
+        output_path = self.work_dir / f"submix_{index:03d}.wav"
         
-        process = await asyncio.create_subprocess_exec(
-            *silence_cmd,
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE
-        )
-        await process.wait()
+        await run_ffmpeg([
+            *self._track_inputs(relative),
+            "-filter_complex_script", str(graph_path),
+            "-map", "[aout]",
+            "-c:a", "pcm_f32le",  # Float keeps overlapping segments from clipping early
+            str(output_path)
+        ])
+        return str(output_path), offset
+    
+    async def _build_mix(self, segments: List[Dict], first_input: int):
+        """
+        Build ffmpeg inputs and an adelay/amix graph file for the dubbed audio
+        Inputs are numbered from first_input; the mix is labelled [aout]
+        """
+        # Duration comes from the extracted WAV header, no ffprobe needed
+        if self.audio_duration_sec is None:
+            raise Exception("Audio must be extracted before mixing")
+        total_duration = self.audio_duration_sec
         
-        # Overlay each segment
-        temp_files = [output_audio]
+        tracks = sorted(
+            (
+                (seg["audio_path"], int(seg["start_ms"]))
+                for seg in segments
+                if seg.get("audio_path")
+            ),
+            key=lambda track: track[1],
+        )
         
-        for i, seg in enumerate(segments):
-            if not seg.get("audio_path"):
-                continue
-            
-            temp_out = self.work_dir / f"temp_mix_{i}.wav"
-            start_sec = seg["start_ms"] / 1000
-            
-            mix_cmd = [
-                "ffmpeg", "-y",
-                "-i", str(temp_files[-1]),
-                "-i", seg["audio_path"],
-                "-filter_complex",
-                f"[1:a]adelay={int(start_sec*1000)}|{int(start_sec*1000)}[delayed];[0:a][delayed]amix=inputs=2:duration=first",
-                str(temp_out)
+        if len(tracks) > MIX_GROUP_SIZE:
+            # One ffmpeg call can't open thousands of inputs; pre-mix in bounded groups
+            tracks = [
+                await self._submix(i // MIX_GROUP_SIZE, tracks[i:i + MIX_GROUP_SIZE])
+                for i in range(0, len(tracks), MIX_GROUP_SIZE)
             ]
-            
-            process = await asyncio.create_subprocess_exec(
-                *mix_cmd,
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE
-            )
-            await process.wait()
-            
-            if temp_out.exists():
-                temp_files.append(temp_out)
         
-        if len(temp_files) > 1:
-            final_audio = temp_files[-1]
-            shutil.copy(final_audio, self.work_dir / "final_audio.wav")
-            return self.work_dir / "final_audio.wav"
+        # Silent base plus every track, mixed in one graph
+        input_args = [
+            "-t", str(total_duration),
+            "-f", "lavfi",
+            "-i", f"anullsrc=channel_layout=stereo:sample_rate=44100",
+            *self._track_inputs(tracks),
+        ]
+        
+        # The graph goes in a file: inline it can exceed the per-argument limit
+        graph_path = self.work_dir / "mix.filtergraph"
+        graph_path.write_text(
+            self._delay_mix_graph(tracks, first_input + 1, first_input, "first")
+        )
         
-        return output_audio
+        return input_args, graph_path
     
-    async def render_final_video(
+    async def render_dubbed_video(
         self,
         video_path: Path,
-        audio_path: Path,
+        segments: List[Dict],
     ) -> Path:
-        """Combine video with new audio"""
+        """Mix dubbed audio segments and mux them with the video in one pass"""
         output_path = self.work_dir / f"output_{self.project_id}.mp4"
         
-        cmd = [
-            "ffmpeg", "-y",
-            "-i", str(video_path),
-            "-i", str(audio_path),
-            "-c:v", "copy",
-            "-map", "0:v:0",
-            "-map", "1:a:0",
-            "-shortest",
-            str(output_path)
-        ]
+        mix_inputs, graph_path = await self._build_mix(segments, first_input=1)
         
-        process = await asyncio.create_subprocess_exec(
-            *cmd,
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE
-        )
-        await process.wait()
+        def command(video_codec: List[str]) -> List[str]:
+            return [
+                "-i", str(video_path),
+                *mix_inputs,
+                "-filter_complex_script", str(graph_path),
+                "-map", "0:v:0",
+                "-map", "[aout]",
+                *video_codec,
+                "-c:a", "aac",
+                "-shortest",
+                str(output_path)
+            ]
+        
+        try:
+            # Fast path: the video stream is untouched, so just copy it
+            await run_ffmpeg(command(["-c:v", "copy"]))
+        except RuntimeError as e:
+            # Only a source codec the mp4 container can't hold is worth a re-encode;
+            # anything else (bad audio input, full disk) would fail the same way
+            if not ffmpeg_error_matches(e, VIDEO_COPY_ERRORS):
+                raise
+            logger.warning(f"Video stream copy failed, re-encoding: {e}")
+            encoders = await video_encoders()
+            for video_codec in list(encoders):
+                try:
+                    await run_ffmpeg(command(video_codec))
+                    break
+                except RuntimeError as encode_error:
+                    if video_codec is SW_VIDEO_ENCODER or not ffmpeg_error_matches(
+                        encode_error, VIDEO_ENCODER_ERRORS
+                    ):
+                        raise
+                    # Listed by ffmpeg but no usable device; don't try it again
+                    logger.warning(f"{video_codec[1]} unavailable: {encode_error}")
+                    if video_codec in encoders:
+                        encoders.remove(video_codec)
         
         if not output_path.exists():
             raise Exception("Failed to render final video")
@@ -363,10 +789,10 @@ class VideoProcessor:
         url = await self.supabase.upload_video(str(local_path), storage_path)
         return url
     
-    def cleanup(self):
+    async def cleanup(self):
         """Clean up temporary files"""
-        if self.work_dir.exists():
-            shutil.rmtree(self.work_dir)
+        # rmtree on hundreds of MB of temp files would block the event loop
+        await asyncio.to_thread(shutil.rmtree, self.work_dir, ignore_errors=True)
     
     async def process_full_pipeline(
         self,
@@ -383,56 +809,72 @@ class VideoProcessor:
                 self.project_id, status, progress, error
             )
         
+        async def stage(status: str, progress: float, work: Awaitable):
+            """Run a pipeline step while its status update is written"""
+            status_write = asyncio.create_task(update_status(status, progress))
+            try:
+                return await work
+            finally:
+                # A failed status write must not cancel the step: thread-backed
+                # steps can't be stopped and would outlive cleanup(). Waiting here
+                # also keeps the write from landing after a "failed" status.
+                status_error, = await asyncio.gather(status_write, return_exceptions=True)
+                if isinstance(status_error, Exception):
+                    logger.warning(f"Status update to {status} failed: {status_error}")
+        
         try:
             # Step 1: Download video
-            await update_status("diarizing", 5)
-            video_path = await self.download_source_video(video_url)
+            video_path = await stage(
+                "diarizing", 5, self.download_source_video(video_url)
+            )
             
             # Step 2: Extract audio
             audio_path = await self.extract_audio(video_path)
             
-            # Step 3: Speaker diarization
-            await update_status("diarizing", 15)
-            segments = await self.run_speaker_diarization(
-                audio_path,
-                language=source_language,
-                num_speakers=num_speakers
-            )
-            
-            # Step 4: Transcribe
-            await update_status("transcribing", 30)
-            segments = await self.transcribe_segments(
-                audio_path,
-                segments,
-                language=source_language
-            )
+            if settings.USE_WHISPERX:
+                # Steps 3-4 fused: one pass over the audio yields speaker-tagged text
+                segments = await stage("transcribing", 15, self.transcribe_with_speakers(
+                    audio_path,
+                    language=source_language,
+                    num_speakers=num_speakers
+                ))
+            else:
+                # Step 3: Speaker diarization
+                segments = await stage("diarizing", 15, self.run_speaker_diarization(
+                    audio_path,
+                    language=source_language,
+                    num_speakers=num_speakers
+                ))
+                
+                # Step 4: Transcribe
+                segments = await stage("transcribing", 30, self.transcribe_segments(
+                    audio_path,
+                    segments,
+                    language=source_language
+                ))
             
             # Step 5: Translate
-            await update_status("translating", 50)
-            segments = await self.translate_segments(
+            segments = await stage("translating", 50, self.translate_segments(
                 segments,
                 source_language,
                 target_language
-            )
+            ))
             
             # Step 6: Generate TTS
-            await update_status("dubbing", 65)
-            segments = await self.generate_multi_voice_audio(
+            segments = await stage("dubbing", 65, self.generate_multi_voice_audio(
                 segments,
                 voice_mapping,
                 target_language
-            )
+            ))
             
-            # Step 7: Mix audio
-            await update_status("mixing", 80)
-            mixed_audio = await self.mix_audio(video_path, segments)
-            
-            # Step 8: Render
-            await update_status("rendering", 90)
-            output_path = await self.render_final_video(video_path, mixed_audio)
+            # Step 7: Mix audio and render (one ffmpeg pass, so no separate "mixing")
+            output_path = await stage(
+                "rendering", 80, self.render_dubbed_video(video_path, segments)
+            )
             
-            # Step 9: Upload
-            output_url = await self.upload_result(output_path)
+            # Step 8: Upload; still "rendering" since the frontend's "uploading"
+            # step is the source upload
+            output_url = await stage("rendering", 95, self.upload_result(output_path))
             
             # Update project with output URL
             await self.supabase.update_project(self.project_id, {
@@ -449,4 +891,4 @@ class VideoProcessor:
             raise
         
         finally:
-            self.cleanup()
+            await self.cleanup()
@@ -0,0 +1,51 @@
+"""
+Arq worker for long-running processing jobs
+Run with: arq app.worker.WorkerSettings
+"""
+import logging
+from typing import Dict
+
+from arq.connections import RedisSettings
+
+from app.config import settings
+from app.api.routes import projects
+from app.services.supabase_client import get_supabase
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+)
+
+
+async def run_speaker_analysis(
+    ctx: Dict,
+    project_id: str,
+    video_url: str,
+    language: str,
+    num_speakers: int,
+):
+    """Speaker analysis job"""
+    await projects.run_speaker_analysis(project_id, video_url, language, num_speakers)
+
+
+async def run_full_processing(ctx: Dict, project_id: str, voice_mapping: Dict[str, str]):
+    """Full dubbing pipeline job"""
+    await projects.run_full_processing(project_id, voice_mapping)
+
+
+async def startup(ctx: Dict):
+    await get_supabase().connect()
+
+
+async def shutdown(ctx: Dict):
+    await get_supabase().close()
+
+
+class WorkerSettings:
+    """Arq worker configuration"""
+    functions = [run_speaker_analysis, run_full_processing]
+    on_startup = startup
+    on_shutdown = shutdown
+    redis_settings = RedisSettings.from_dsn(settings.REDIS_URL or "redis://localhost:6379")
+    max_jobs = settings.WORKER_MAX_JOBS
+    job_timeout = settings.WORKER_JOB_TIMEOUT
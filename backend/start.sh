@@ -1,4 +1,10 @@
 #!/bin/bash
 pip install -r requirements.txt
+
+# PROCESS_TYPE=worker runs the Arq job consumer instead of the API
+if [ "$PROCESS_TYPE" = "worker" ]; then
+    exec arq app.worker.WorkerSettings
+fi
+
 uvicorn app.main:app --host 0.0.0.0 --port ${PORT:-8000}
 
@@ -0,0 +1,20 @@
+"""
+Import smoke tests: the API and the Arq worker must load
+"""
+import importlib
+import sys
+
+
+def test_api_imports():
+    main = importlib.import_module("app.main")
+    paths = {route.path for route in main.app.routes}
+    assert {"/health", "/api/languages/"} <= paths
+    # The ML stack is loaded lazily by the jobs, not by the web process
+    assert "faster_whisper" not in sys.modules
+    assert "videotrans" not in sys.modules
+
+
+def test_worker_imports():
+    worker = importlib.import_module("app.worker")
+    names = {func.__name__ for func in worker.WorkerSettings.functions}
+    assert {"run_speaker_analysis", "run_full_processing"} <= names
@@ -0,0 +1,85 @@
+"""
+Unit tests for SupabaseClient's batched Postgres inserts
+"""
+import asyncio
+from contextlib import asynccontextmanager
+
+from app.services import supabase_client
+from app.services.supabase_client import SupabaseClient
+
+
+class FakeConnection:
+    def __init__(self):
+        self.queries = []
+        self.transactions = 0
+    
+    @asynccontextmanager
+    async def transaction(self):
+        self.transactions += 1
+        yield
+    
+    async def fetch(self, query, *args):
+        self.queries.append((query, args))
+        rows = query.split(" VALUES ")[1].count("(")
+        return [{"n": i} for i in range(rows)]
+
+
+class FakePool:
+    def __init__(self):
+        self.conn = FakeConnection()
+    
+    @asynccontextmanager
+    async def acquire(self):
+        yield self.conn
+
+
+def insert_rows(monkeypatch, rows):
+    pool = FakePool()
+    client = SupabaseClient()
+    
+    async def get_db_pool():
+        return pool
+    
+    monkeypatch.setattr(client, "_get_db_pool", get_db_pool)
+    inserted = asyncio.run(client._insert_rows("segments", rows))
+    return pool.conn, inserted
+
+
+def test_insert_rows_numbers_parameters_per_batch(monkeypatch):
+    monkeypatch.setattr(supabase_client, "INSERT_BATCH_SIZE", 2)
+    rows = [{"speaker": f"S{i}", "start_ms": i} for i in range(5)]
+    
+    conn, _ = insert_rows(monkeypatch, rows)
+    
+    assert conn.transactions == 1
+    assert [query for query, _ in conn.queries] == [
+        'INSERT INTO "segments" ("speaker", "start_ms") VALUES ($1, $2), ($3, $4) RETURNING *',
+        'INSERT INTO "segments" ("speaker", "start_ms") VALUES ($1, $2), ($3, $4) RETURNING *',
+        'INSERT INTO "segments" ("speaker", "start_ms") VALUES ($1, $2) RETURNING *',
+    ]
+    assert [args for _, args in conn.queries] == [
+        ("S0", 0, "S1", 1),
+        ("S2", 2, "S3", 3),
+        ("S4", 4),
+    ]
+
+
+def test_insert_rows_stays_under_postgres_parameter_cap(monkeypatch):
+    columns = [f"c{i}" for i in range(100)]
+    rows = [dict.fromkeys(columns, 0) for _ in range(400)]
+    
+    conn, _ = insert_rows(monkeypatch, rows)
+    
+    # 32767 // 100 columns = 327 rows per statement
+    assert [len(args) for _, args in conn.queries] == [32700, 7300]
+    assert max(len(args) for _, args in conn.queries) <= 32767
+    assert conn.queries[0][0].endswith("$32700) RETURNING *")
+
+
+def test_insert_rows_uses_default_batch_size(monkeypatch):
+    rows = [{"label": "A"} for _ in range(1200)]
+    
+    conn, inserted = insert_rows(monkeypatch, rows)
+    
+    assert [len(args) for _, args in conn.queries] == [500, 500, 200]
+    assert len(inserted) == 1200
@@ -0,0 +1,168 @@
+"""
+Unit tests for the pure parts of VideoProcessor
+"""
+import asyncio
+import sys
+from types import ModuleType, SimpleNamespace
+
+import numpy as np
+import pytest
+import soundfile as sf
+
+from app.config import settings
+from app.services import video_processor
+from app.services.video_processor import VideoProcessor
+
+
+@pytest.fixture
+def processor(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "TEMP_DIR", tmp_path)
+    return VideoProcessor("test-project")
+
+
+class FakeBatchedPipeline:
+    """Emits one piece per clip, named after the clip's start sample"""
+    
+    def __init__(self, sample_rate: int):
+        self.sample_rate = sample_rate
+        self.calls = []
+    
+    def transcribe(self, audio, clip_timestamps, **kwargs):
+        self.calls.append(clip_timestamps)
+        pieces = [
+            SimpleNamespace(
+                start=clip["start"] / self.sample_rate,
+                end=clip["end"] / self.sample_rate,
+                text=f" piece{clip['start']} ",
+            )
+            for clip in clip_timestamps
+        ]
+        return pieces, None
+
+
+def test_transcribe_clips_maps_pieces_to_segments():
+    batched = FakeBatchedPipeline(sample_rate=100)
+    # Segment 0 spans two clips; segment 2 has none
+    clips = [(0, 0, 3000), (0, 3000, 4000), (1, 4000, 4500)]
+    
+    texts = VideoProcessor._transcribe_clips(batched, np.zeros(4500), 100, clips, 3, "en")
+    
+    assert texts == ["piece0 piece3000", "piece4000", ""]
+
+
+def test_transcribe_clips_without_clips_skips_whisper():
+    batched = FakeBatchedPipeline(sample_rate=100)
+    
+    assert VideoProcessor._transcribe_clips(batched, np.zeros(0), 100, [], 2, "en") == ["", ""]
+    assert batched.calls == []
+
+
+def test_transcribe_segments_splits_segments_longer_than_30s(processor, tmp_path, monkeypatch):
+    sample_rate = 1000
+    audio_path = tmp_path / "audio.wav"
+    sf.write(audio_path, np.zeros(50 * sample_rate, dtype=np.float32), sample_rate)
+    batched = FakeBatchedPipeline(sample_rate)
+    monkeypatch.setattr(video_processor, "_batched_whisper", lambda: batched)
+    
+    segments = [
+        {"speaker": "A", "start_ms": 1000, "end_ms": 41000},  # 40s: two clips
+        {"speaker": "B", "start_ms": 42000, "end_ms": 43000},
+    ]
+    result = asyncio.run(processor.transcribe_segments(audio_path, segments))
+    
+    # Clips are addressed in the packed buffer: 30s + 10s for A, then B
+    assert batched.calls == [[
+        {"start": 0, "end": 30000},
+        {"start": 30000, "end": 40000},
+        {"start": 40000, "end": 41000},
+    ]]
+    assert [seg["text"] for seg in result] == ["piece0 piece30000", "piece40000"]
+    assert result[0] is segments[0]
+
+
+def fake_google_translator(monkeypatch, trans):
+    """Install a stand-in for videotrans.translator._google"""
+    google = ModuleType("videotrans.translator._google")
+    google.trans = trans
+    monkeypatch.setitem(sys.modules, "videotrans", ModuleType("videotrans"))
+    monkeypatch.setitem(sys.modules, "videotrans.translator", ModuleType("videotrans.translator"))
+    monkeypatch.setitem(sys.modules, "videotrans.translator._google", google)
+
+
+def test_translate_segments_falls_back_when_lines_dont_match(processor, monkeypatch):
+    requests = []
+    
+    def trans(text, source_code, target_code):
+        requests.append(text)
+        if "\n" in text:
+            # The batch comes back with its lines merged
+            return text.replace("\n", " ").upper()
+        return text.upper()
+    
+    fake_google_translator(monkeypatch, trans)
+    monkeypatch.setattr(video_processor, "TRANSLATE_BATCH_SIZE", 3)
+    
+    segments = [{"text": t} for t in ["one", "two\nlines", "", "three", "four"]]
+    result = asyncio.run(processor.translate_segments(segments, "en", "vi"))
+    
+    assert [seg["translated_text"] for seg in result] == [
+        "ONE", "TWO LINES", "", "THREE", "FOUR"
+    ]
+    # Batch 1 failed and was retried per segment; batch 2 kept its line structure.
+    # Batches run concurrently, so only the set of requests is deterministic.
+    assert sorted(requests) == sorted([
+        "one\ntwo lines\nthree", "one", "two lines", "three", "four",
+    ])
+
+
+def test_translate_segments_keeps_batched_lines(processor, monkeypatch):
+    requests = []
+    
+    def trans(text, source_code, target_code):
+        requests.append(text)
+        return text.upper()
+    
+    fake_google_translator(monkeypatch, trans)
+    
+    segments = [{"text": t} for t in ["a", "b", "c"]]
+    result = asyncio.run(processor.translate_segments(segments, "en", "vi"))
+    
+    assert [seg["translated_text"] for seg in result] == ["A", "B", "C"]
+    assert requests == ["a\nb\nc"]
+
+
+def test_get_speakers_summary(processor):
+    segments = [
+        {"speaker": "SPEAKER_01", "start_ms": 0, "end_ms": 1000},
+        {"speaker": "SPEAKER_00", "start_ms": 1000, "end_ms": 1500},
+        {"speaker": "SPEAKER_01", "start_ms": 2000, "end_ms": 4500},
+        {"speaker": "SPEAKER_00", "start_ms": 5000, "end_ms": 5250},
+        {"speaker": "SPEAKER_02", "start_ms": 6000, "end_ms": 7000},
+    ]
+    
+    summary = processor.get_speakers_summary(segments)
+    
+    assert summary == {
+        "SPEAKER_00": {
+            "label": "SPEAKER_00",
+            "total_duration_ms": 750,
+            "segment_count": 2,
+            "segment_indices": [1, 3],
+        },
+        "SPEAKER_01": {
+            "label": "SPEAKER_01",
+            "total_duration_ms": 3500,
+            "segment_count": 2,
+            "segment_indices": [0, 2],
+        },
+        "SPEAKER_02": {
+            "label": "SPEAKER_02",
+            "total_duration_ms": 1000,
+            "segment_count": 1,
+            "segment_indices": [4],
+        },
+    }
+
+
+def test_get_speakers_summary_empty(processor):
+    assert processor.get_speakers_summary([]) == {}